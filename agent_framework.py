@@ -1,11 +1,21 @@
+import copy
 import json
 import pandas as pd
 from typing import Dict, List, Optional, Union, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import re
+import uuid
+from collections import deque
 from pathlib import Path
 
+# Keywords used for the simplified tone analysis
+TONE_KEYWORDS = {
+    "professional": ("solution", "expertise", "quality", "reliable"),
+    "friendly": ("help", "support", "easy", "simple", "welcome"),
+    "conversational": ("you", "your", "we", "let's", "together")
+}
+
 @dataclass
 class BrandGuidelines:
     """Brand guidelines configuration"""
@@ -35,6 +45,7 @@ class CopyRequest:
     target_format: CopyConstraints
     context: Optional[str] = None
     reference_copies: Optional[List[str]] = None
+    variant: int = 0  # index of this request among the variants of a batch
 
 @dataclass
 class GeneratedCopy:
@@ -49,10 +60,32 @@ class GeneratedCopy:
 class MultiModalCopyAgent:
     """Main agent class for multi-modal copywriting"""
     
-    def __init__(self, brand_guidelines: BrandGuidelines):
+    def __init__(self, brand_guidelines: BrandGuidelines, history_limit: Optional[int] = None):
         self.brand_guidelines = brand_guidelines
-        self.copy_history = []
+        self.copy_history = deque(maxlen=history_limit)  # unbounded when history_limit is None
         self.context_memory = {}
+        self._reset_totals()
+        
+        # Lowercased and deduplicated once here instead of on every compliance check
+        self._avoid_words = frozenset(word.lower() for word in brand_guidelines.avoid_words)
+        self._preferred_words = frozenset(word.lower() for word in brand_guidelines.preferred_words)
+        self._tones = frozenset(brand_guidelines.tone_of_voice)
+        self._tone_keywords = tuple(TONE_KEYWORDS[tone] for tone in brand_guidelines.tone_of_voice
+                                    if tone in TONE_KEYWORDS)
+    
+    def spawn(self) -> "MultiModalCopyAgent":
+        """Create an agent sharing this agent's prepared guidelines but with its own history"""
+        agent = copy.copy(self)
+        agent.copy_history = deque(maxlen=self.copy_history.maxlen)
+        agent.context_memory = {}
+        agent._reset_totals()
+        return agent
+    
+    def _reset_totals(self):
+        """Reset the running totals behind the performance metrics"""
+        self._total_copies = 0
+        self._total_compliance = 0.0
+        self._total_words = 0
         
     def process_input(self, request: CopyRequest) -> Dict[str, Any]:
         """Process multi-modal input data"""
@@ -81,27 +114,17 @@ class MultiModalCopyAgent:
         text_lower = text.lower()
         
         # Check avoided words
-        for avoid_word in self.brand_guidelines.avoid_words:
-            if avoid_word.lower() in text_lower:
-                score -= 0.1
+        avoided_count = sum(1 for word in self._avoid_words if word in text_lower)
+        score -= avoided_count * 0.1
         
         # Check preferred words usage
-        preferred_count = sum(1 for word in self.brand_guidelines.preferred_words 
-                            if word.lower() in text_lower)
+        preferred_count = sum(1 for word in self._preferred_words if word in text_lower)
         score += min(preferred_count * 0.05, 0.2)
         
         # Tone analysis (simplified)
-        tone_keywords = {
-            "professional": ["solution", "expertise", "quality", "reliable"],
-            "friendly": ["help", "support", "easy", "simple", "welcome"],
-            "conversational": ["you", "your", "we", "let's", "together"]
-        }
-        
-        for tone in self.brand_guidelines.tone_of_voice:
-            if tone in tone_keywords:
-                tone_matches = sum(1 for keyword in tone_keywords[tone] 
-                                 if keyword in text_lower)
-                score += min(tone_matches * 0.02, 0.1)
+        for keywords in self._tone_keywords:
+            tone_matches = sum(1 for keyword in keywords if keyword in text_lower)
+            score += min(tone_matches * 0.02, 0.1)
         
         return min(max(score, 0.0), 1.0)
     
@@ -153,9 +176,9 @@ class MultiModalCopyAgent:
         description = str(data) if not isinstance(data, dict) else json.dumps(data)
         
         # Apply brand voice
-        if "professional" in self.brand_guidelines.tone_of_voice:
+        if "professional" in self._tones:
             description = f"Our solution delivers {description}"
-        elif "friendly" in self.brand_guidelines.tone_of_voice:
+        elif "friendly" in self._tones:
             description = f"We help you with {description}"
         
         return self.ensure_length_compliance(description, constraints)
@@ -203,6 +226,12 @@ class MultiModalCopyAgent:
     
     def generate_copy(self, request: CopyRequest) -> GeneratedCopy:
         """Main method to generate copy"""
+        result = self._create_copy(request)
+        self._record_copy(result)
+        return result
+    
+    def _create_copy(self, request: CopyRequest) -> GeneratedCopy:
+        """Generate copy for a request without storing it in history"""
         # Process input
         processed_input = self.process_input(request)
         
@@ -216,7 +245,7 @@ class MultiModalCopyAgent:
             word_count = content.to_string().count(' ') + 1
         else:
             # Generate paragraph or bullet format
-            content = self.generate_text_copy(processed_input, request.target_format)
+            content = self.generate_text_copy(processed_input, request.target_format, request.variant)
             word_count = len(content.split())
         
         # Check brand compliance
@@ -224,7 +253,7 @@ class MultiModalCopyAgent:
         compliance_score = self.analyze_brand_compliance(text_for_analysis)
         
         # Create result
-        result = GeneratedCopy(
+        return GeneratedCopy(
             content=content,
             metadata={
                 "request_type": request.content_type,
@@ -234,15 +263,33 @@ class MultiModalCopyAgent:
             word_count=word_count,
             compliance_score=compliance_score,
             timestamp=datetime.now(),
-            request_id=f"copy_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            request_id=f"copy_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         )
-        
-        # Store in history
+    
+    def _record_copy(self, result: GeneratedCopy):
+        """Store a generated copy in history and update the running totals"""
         self.copy_history.append(result)
-        
-        return result
+        self._total_copies += 1
+        self._total_compliance += result.compliance_score
+        self._total_words += result.word_count
+    
+    def generate_copy_batch(self, requests: List[CopyRequest]) -> List[GeneratedCopy]:
+        """Generate copy for several requests in one call, skipping duplicate results"""
+        # An LLM backend would send these as one batched generation;
+        # the placeholder generators handle them one at a time
+        results = []
+        seen = set()
+        for request in requests:
+            result = self._create_copy(request)
+            text = result.content.to_string() if isinstance(result.content, pd.DataFrame) else result.content
+            if text in seen:
+                continue
+            seen.add(text)
+            self._record_copy(result)
+            results.append(result)
+        return results
     
-    def generate_text_copy(self, processed_input: Dict, constraints: CopyConstraints) -> str:
+    def generate_text_copy(self, processed_input: Dict, constraints: CopyConstraints, variant: int = 0) -> str:
         """Generate text-based copy (paragraph/bullet format)"""
         # This would integrate with your chosen LLM (OpenAI, Claude, etc.)
         # Placeholder implementation
@@ -255,7 +302,9 @@ class MultiModalCopyAgent:
         
         # Add brand messaging
         if self.brand_guidelines.key_messaging:
-            copy_elements.append(self.brand_guidelines.key_messaging[0])
+            # Each variant leads with a different key message
+            key_messaging = self.brand_guidelines.key_messaging
+            copy_elements.append(key_messaging[variant % len(key_messaging)])
         
         # Add main content
         copy_elements.append(base_content)
@@ -278,16 +327,14 @@ class MultiModalCopyAgent:
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get agent performance metrics"""
-        if not self.copy_history:
+        if not self._total_copies:
             return {"message": "No copies generated yet"}
         
-        compliance_scores = [copy.compliance_score for copy in self.copy_history]
-        word_counts = [copy.word_count for copy in self.copy_history]
-        
+        # Totals cover every copy, including ones dropped from a bounded history
         return {
-            "total_copies_generated": len(self.copy_history),
-            "average_compliance_score": sum(compliance_scores) / len(compliance_scores),
-            "average_word_count": sum(word_counts) / len(word_counts),
+            "total_copies_generated": self._total_copies,
+            "average_compliance_score": self._total_compliance / self._total_copies,
+            "average_word_count": self._total_words / self._total_copies,
             "recent_copies": len([c for c in self.copy_history 
                                 if (datetime.now() - c.timestamp).days <= 7])
         }
@@ -1,11 +1,29 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import orjson
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, replace
 import io
+import os
+import time
+import contextlib
 import re
+import hashlib
+import shutil
+import tempfile
+from collections import Counter, deque
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# pyarrow is optional; it is used for table downloads and for archiving old history when available
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 # Import the agent framework (assuming it's in the same directory)
 from agent_framework import (
@@ -25,7 +43,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -55,22 +73,256 @@ st.markdown("""
         border: 1px solid #c3e6cb;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Static "About" text for the settings tab
+_ABOUT = """
+    **AI Copywriting Agent v1.0**
+    
+    This application helps you generate brand-compliant copy using AI while maintaining consistency 
+    with your brand guidelines and learning from your previous successful copies.
+    
+    **Features:**
+    - Multi-modal input processing
+    - Brand compliance scoring
+    - Multiple output formats
+    - Copy history and analytics
+    - Export/import capabilities
+    """
+
+# Separators for the multi-value text inputs
+_LINES = re.compile(r"\r?\n")
+_COMMAS = re.compile(r",")
+
+# Number of copies listed per page in the history tab
+_HISTORY_PAGE_SIZE = 10
+# Characters of text content shown before the "Show full" toggle
+_HISTORY_PREVIEW_CHARS = 2000
+
+# Copies kept in memory; older ones are archived to Parquet when pyarrow is available.
+# Each session archives into its own directory under the root, and directories
+# untouched for longer than the retention period are swept away.
+_HISTORY_MAXLEN = 100
+_HISTORY_ARCHIVE_ROOT = Path(os.environ.get("COPYBOT_HISTORY_DIR",
+                                            Path(tempfile.gettempdir()) / "copybot-history"))
+_HISTORY_ARCHIVE_PREFIX = "session-"  # only directories with this prefix are ever swept
+try:
+    _HISTORY_RETENTION_HOURS = float(os.environ.get("COPYBOT_HISTORY_RETENTION_HOURS", 24))
+except ValueError:
+    _HISTORY_RETENTION_HOURS = 24.0
+if not _HISTORY_RETENTION_HOURS > 0:  # also rejects NaN
+    _HISTORY_RETENTION_HOURS = 24.0
+
+# Uploaded files are copied in 1 MiB chunks and spill to disk past 8 MiB
+_CHUNK_SIZE = 1 << 20
+_SPOOL_MAX_SIZE = 8 << 20
+_MAX_FILE_WORKERS = 8
+
+# Tiny request used to warm up a freshly built agent
+_WARMUP_REQUEST = CopyRequest(
+    content_type="Warmup",
+    input_data={"main_content": "Warmup", "features": {"warmup": "Warmup"}},
+    target_format=CopyConstraints(
+        max_length=10,
+        min_length=1,
+        format_type="table",
+        required_columns=["Feature", "Benefit", "Description"],
+        tone="professional"
+    )
+)
 
 # Initialize session state
 if 'agent' not in st.session_state:
     st.session_state.agent = None
 if 'copy_history' not in st.session_state:
-    st.session_state.copy_history = []
+    st.session_state.copy_history = deque(maxlen=_HISTORY_MAXLEN)
 if 'brand_guidelines' not in st.session_state:
     st.session_state.brand_guidelines = None
+if 'stats' not in st.session_state:
+    st.session_state.stats = {"total_compliance": 0.0, "total_words": 0, "n": 0}
+if 'history_rows' not in st.session_state:
+    st.session_state.history_rows = []
+if 'content_type_counts' not in st.session_state:
+    st.session_state.content_type_counts = Counter()
+
+def split_tokens(text: str, sep: re.Pattern) -> List[str]:
+    """Split text on a separator, dropping surrounding whitespace and empty entries"""
+    return [t for t in (s.strip() for s in sep.split(text)) if t]
+
+def parse_columns(columns_input: str) -> Tuple[str, ...]:
+    """Parse the table column names, one per line"""
+    return tuple(col for col in map(str.strip, columns_input.splitlines()) if col)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_agent(guidelines_json: bytes) -> MultiModalCopyAgent:
+    """Build and warm up an agent once per process for a given set of guidelines"""
+    agent = MultiModalCopyAgent(BrandGuidelines(**orjson.loads(guidelines_json)),
+                                history_limit=_HISTORY_MAXLEN)
+    agent.generate_copy(_WARMUP_REQUEST)
+    return agent
 
 def initialize_agent(brand_guidelines: BrandGuidelines):
     """Initialize the copywriting agent"""
-    st.session_state.agent = MultiModalCopyAgent(brand_guidelines)
     st.session_state.brand_guidelines = brand_guidelines
+    # Serialized once per save rather than on every settings render
+    st.session_state.brand_guidelines_json = orjson.dumps(brand_guidelines, option=orjson.OPT_INDENT_2)
+    # The cached agent is shared by all sessions, so each session gets its own history
+    st.session_state.agent = build_agent(st.session_state.brand_guidelines_json).spawn()
+
+def record_copy(result: GeneratedCopy):
+    """Append a generated copy to the history and update the running stats"""
+    history = st.session_state.copy_history
+    if len(history) == history.maxlen:
+        archive_copy(history[0])
+    history.append(result)
+    
+    stats = st.session_state.stats
+    stats["total_compliance"] += result.compliance_score
+    stats["total_words"] += result.word_count
+    stats["n"] += 1
+    st.session_state.content_type_counts[result.metadata.get("request_type", "Unknown")] += 1
+    
+    st.session_state.history_rows.append({
+        "Copy #": stats["n"],
+        "Brand Compliance": result.compliance_score,
+        "Word Count": result.word_count,
+        "Timestamp": result.timestamp
+    })
+
+def clear_history():
+    """Reset the copy history and everything derived from it"""
+    st.session_state.copy_history = deque(maxlen=_HISTORY_MAXLEN)
+    directory = st.session_state.pop("archive_dir", None)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+    st.session_state.stats = {"total_compliance": 0.0, "total_words": 0, "n": 0}
+    st.session_state.history_rows = []
+    st.session_state.content_type_counts = Counter()
+    st.session_state.pop("history_df", None)
+    st.session_state.pop("trend_df", None)
+    st.session_state.pop("last_results", None)
+    st.session_state.pop("requested_variants", None)
+
+def archive_dir() -> Path:
+    """Directory holding this session's archived copies, created on first use"""
+    if "archive_dir" not in st.session_state:
+        _HISTORY_ARCHIVE_ROOT.mkdir(parents=True, exist_ok=True)
+        st.session_state.archive_dir = Path(tempfile.mkdtemp(prefix=_HISTORY_ARCHIVE_PREFIX, dir=_HISTORY_ARCHIVE_ROOT))
+    return st.session_state.archive_dir
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def sweep_archives():
+    """Remove session archives older than the retention period, at most once an hour"""
+    if not _HISTORY_ARCHIVE_ROOT.is_dir():
+        return
+    cutoff = time.time() - _HISTORY_RETENTION_HOURS * 3600
+    for directory in _HISTORY_ARCHIVE_ROOT.glob(f"{_HISTORY_ARCHIVE_PREFIX}*"):
+        try:
+            if directory.is_dir() and directory.stat().st_mtime < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+        except OSError:
+            pass  # removed concurrently
+
+def content_as_text(content) -> str:
+    """Lossless text form of a copy's content, JSON records for tables"""
+    if isinstance(content, pd.DataFrame):
+        return content.to_json(orient="records", force_ascii=False)
+    return str(content)
+
+def archive_copy(copy: GeneratedCopy):
+    """Write a copy that is about to leave the in-memory history to Parquet"""
+    if pa is None:
+        return
+    table = pa.table({
+        "timestamp": [copy.timestamp],
+        "content": [content_as_text(copy.content)],
+        "word_count": [copy.word_count],
+        "compliance_score": [copy.compliance_score],
+        "metadata": [orjson.dumps(copy.metadata).decode()]
+    })
+    try:
+        directory = archive_dir()
+        directory.mkdir(parents=True, exist_ok=True)  # may have been swept while idle
+        pq.write_table(table, directory / f"{copy.request_id}.parquet")
+    except OSError:
+        pass  # archive not writable, drop the copy as without pyarrow
+
+def load_archived_copies() -> List[Dict[str, Any]]:
+    """Archived copies in export form, oldest first"""
+    directory = st.session_state.get("archive_dir")
+    if pa is None or directory is None or not directory.is_dir():
+        return []
+    records = []
+    for path in directory.glob("*.parquet"):
+        # Best effort like archive_copy: skip files that are corrupt or were swept meanwhile
+        try:
+            rows = pq.read_table(path).to_pylist()
+            for row in rows:
+                row["metadata"] = orjson.loads(row["metadata"])
+        except (OSError, pa.ArrowInvalid, orjson.JSONDecodeError):
+            continue
+        records.extend(rows)
+    return sorted(records, key=lambda record: record["timestamp"])
+
+def history_frame() -> pd.DataFrame:
+    """History rows as a DataFrame, rebuilt only when new copies were added"""
+    rows = st.session_state.history_rows
+    cached = st.session_state.get("history_df")
+    if cached is None or len(cached) != len(rows):
+        cached = pd.DataFrame(rows)
+        st.session_state.history_df = cached
+    return cached
+
+def trend_frame() -> pd.DataFrame:
+    """Compliance and word count per in-memory copy, rebuilt only when new copies were added"""
+    history = st.session_state.copy_history
+    total = st.session_state.stats["n"]
+    cached = st.session_state.get("trend_df")
+    if cached is None or cached[0] != total:
+        n = len(history)
+        compliance = np.empty(n, dtype=np.float32)
+        words = np.empty(n, dtype=np.int32)
+        for i, copy in enumerate(history):
+            compliance[i] = copy.compliance_score
+            words[i] = copy.word_count
+        df = pd.DataFrame(
+            {"Brand Compliance": compliance, "Word Count": words},
+            index=pd.RangeIndex(total - n + 1, total + 1, name="Copy #")
+        )
+        cached = (total, df)
+        st.session_state.trend_df = cached
+    return cached[1]
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a generated table to CSV"""
+    if pa is not None:
+        try:
+            csv_buffer = io.BytesIO()
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), csv_buffer)
+            return csv_buffer.getvalue()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # mixed-type columns, fall back to pandas
+    return df.to_csv(index=False).encode()
+
+def to_xlsx_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a generated table to Excel"""
+    excel_buffer = io.BytesIO()
+    df.to_excel(excel_buffer, index=False, engine="xlsxwriter")
+    return excel_buffer.getvalue()
+
+# Only the latest results are on screen, so a few entries are enough
+@st.cache_data(show_spinner=False, max_entries=32)
+def serialize_table(request_id: str, _df: pd.DataFrame) -> Tuple[bytes, bytes]:
+    """CSV and Excel bytes for a generated table, cached per request"""
+    return to_csv_bytes(_df), to_xlsx_bytes(_df)
+
+def inject_css():
+    """Inject the custom CSS block"""
+    st.markdown(_CSS, unsafe_allow_html=True)
 
 def main():
+    inject_css()
+    sweep_archives()
     st.markdown('<h1 class="main-header">🤖 AI Copywriting Agent</h1>', unsafe_allow_html=True)
     
     # Sidebar for brand guidelines and settings
@@ -90,17 +342,17 @@ def main():
             "Enter key messages (one per line)",
             value="We deliver exceptional results\nYour trusted partner in success",
             height=100
-        ).split('\n')
-        key_messages = [msg.strip() for msg in key_messages if msg.strip()]
+        )
+        key_messages = split_tokens(key_messages, _LINES)
         
         # Words to avoid/prefer
         avoid_words = st.text_input("Words to Avoid (comma-separated)", 
-                                   value="cheap, basic, simple").split(',')
-        avoid_words = [word.strip().lower() for word in avoid_words if word.strip()]
+                                   value="cheap, basic, simple")
+        avoid_words = split_tokens(avoid_words.lower(), _COMMAS)
         
         prefer_words = st.text_input("Preferred Words (comma-separated)", 
-                                    value="premium, advanced, innovative, quality").split(',')
-        prefer_words = [word.strip().lower() for word in prefer_words if word.strip()]
+                                    value="premium, advanced, innovative, quality")
+        prefer_words = split_tokens(prefer_words.lower(), _COMMAS)
         
         # Target audience
         target_audience = st.text_area("Target Audience", 
@@ -141,6 +393,22 @@ def main():
     with tab4:
         settings_interface()
 
+def process_file(file, spooled) -> Tuple[str, Dict[str, Any]]:
+    """Stream an uploaded file into a spooled temp file, hashing it on the way"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+        spooled.write(chunk)
+    spooled.seek(0)
+    return file.name, {
+        "type": file.type,
+        "size": file.size,
+        "sha256": digest.hexdigest(),
+        "handle": spooled
+    }
+
+@st.fragment
 def generate_copy_interface():
     """Interface for generating new copy"""
     st.markdown('<h2 class="section-header">Generate New Copy</h2>', unsafe_allow_html=True)
@@ -194,7 +462,7 @@ def generate_copy_interface():
             default_columns = ["Feature", "Benefit", "Description"]
             columns_input = st.text_area("Column Names (one per line)", 
                                         value="\n".join(default_columns), height=80)
-            required_columns = [col.strip() for col in columns_input.split('\n') if col.strip()]
+            required_columns = list(parse_columns(columns_input))
         else:
             required_columns = []
         
@@ -204,31 +472,51 @@ def generate_copy_interface():
         # Call to action
         cta_required = st.checkbox("Include Call-to-Action")
         
+        # Number of variants generated in one batch; the table generator
+        # always produces the same table, so variants only apply to text formats
+        if format_type == "table":
+            n_variants = 1
+        else:
+            n_variants = st.number_input("Variants", min_value=1, max_value=8, value=1, step=1)
+        
         # Generate button
         if st.button("🚀 Generate Copy", type="primary", use_container_width=True):
             generate_copy(content_type, text_input, uploaded_files, context, reference_copies,
-                         format_type, min_length, max_length, required_columns, copy_tone, cta_required)
+                         format_type, min_length, max_length, required_columns, copy_tone, cta_required,
+                         n_variants)
+    
+    # Keep the latest results visible across reruns of this tab
+    last_results = st.session_state.get("last_results")
+    if last_results:
+        if len(last_results) < st.session_state.get("requested_variants", 1):
+            st.caption(f"Only {len(last_results)} distinct variant(s) could be generated; duplicates were skipped.")
+        if len(last_results) == 1:
+            display_generated_copy(last_results[0])
+        else:
+            variant_tabs = st.tabs([f"Variant {i + 1}" for i in range(len(last_results))])
+            for variant_tab, result in zip(variant_tabs, last_results):
+                with variant_tab:
+                    display_generated_copy(result)
 
 def generate_copy(content_type, text_input, uploaded_files, context, reference_copies,
-                 format_type, min_length, max_length, required_columns, copy_tone, cta_required):
+                 format_type, min_length, max_length, required_columns, copy_tone, cta_required,
+                 n_variants=1):
     """Generate copy based on inputs"""
     
     if not text_input.strip():
         st.error("Please provide main content/description.")
         return
     
-    with st.spinner("🤖 Generating copy..."):
+    # The spooled upload handles live until generation finishes
+    with st.spinner("🤖 Generating copy..."), contextlib.ExitStack() as stack:
         try:
             # Process uploaded files
             file_data = {}
             if uploaded_files:
-                for file in uploaded_files:
-                    file_content = file.read()
-                    file_data[file.name] = {
-                        "type": file.type,
-                        "size": len(file_content),
-                        "content": file_content
-                    }
+                handles = [stack.enter_context(tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE))
+                           for _ in uploaded_files]
+                with ThreadPoolExecutor(max_workers=min(_MAX_FILE_WORKERS, len(uploaded_files))) as executor:
+                    file_data = dict(executor.map(process_file, uploaded_files, handles))
             
             # Create copy constraints
             constraints = CopyConstraints(
@@ -252,20 +540,28 @@ def generate_copy(content_type, text_input, uploaded_files, context, reference_c
                 input_data=input_data,
                 target_format=constraints,
                 context=context,
-                reference_copies=[ref.strip() for ref in reference_copies.split('\n') if ref.strip()] if reference_copies else None
+                reference_copies=split_tokens(reference_copies, _LINES) if reference_copies else None
             )
             
             # Generate copy
-            result = st.session_state.agent.generate_copy(request)
+            if n_variants == 1:
+                results = [st.session_state.agent.generate_copy(request)]
+            else:
+                variants = [replace(request, variant=i) for i in range(n_variants)]
+                results = st.session_state.agent.generate_copy_batch(variants)
             
             # Store in session state
-            st.session_state.copy_history.append(result)
-            
-            # Display results
-            display_generated_copy(result)
+            for result in results:
+                record_copy(result)
+            st.session_state.last_results = results
+            st.session_state.requested_variants = n_variants
             
         except Exception as e:
             st.error(f"Error generating copy: {str(e)}")
+            return
+    
+    # This tab is a fragment, so rerun the full app to refresh history and analytics
+    st.rerun()
 
 def display_generated_copy(result: GeneratedCopy):
     """Display the generated copy results"""
@@ -289,24 +585,27 @@ def display_generated_copy(result: GeneratedCopy):
         st.dataframe(result.content, use_container_width=True)
         
         # Download options for table
+        csv_data, excel_data = serialize_table(result.request_id, result.content)
         col1, col2 = st.columns(2)
         with col1:
-            csv_data = result.content.to_csv(index=False)
-            st.download_button("📥 Download CSV", csv_data, "generated_copy.csv", "text/csv")
+            st.download_button("📥 Download CSV", csv_data, "generated_copy.csv", "text/csv",
+                               key=f"csv_{result.request_id}")
         with col2:
-            excel_buffer = io.BytesIO()
-            result.content.to_excel(excel_buffer, index=False)
-            st.download_button("📥 Download Excel", excel_buffer.getvalue(), "generated_copy.xlsx")
+            st.download_button("📥 Download Excel", excel_data, "generated_copy.xlsx",
+                               key=f"xlsx_{result.request_id}")
     else:
-        st.text_area("Generated Copy", value=str(result.content), height=200)
+        st.text_area("Generated Copy", value=str(result.content), height=200,
+                     key=f"generated_{result.request_id}")
         
         # Download option for text
-        st.download_button("📥 Download Text", str(result.content), "generated_copy.txt", "text/plain")
+        st.download_button("📥 Download Text", str(result.content), "generated_copy.txt", "text/plain",
+                           key=f"txt_{result.request_id}")
     
     # Metadata
     with st.expander("📊 Generation Details"):
         st.json(result.metadata)
 
+@st.fragment
 def copy_history_interface():
     """Interface for viewing copy history"""
     st.markdown('<h2 class="section-header">Copy History</h2>', unsafe_allow_html=True)
@@ -316,34 +615,68 @@ def copy_history_interface():
         return
     
     # History overview
+    stats = st.session_state.stats
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Copies", len(st.session_state.copy_history))
+        st.metric("Total Copies", stats["n"])
     with col2:
-        avg_compliance = sum(copy.compliance_score for copy in st.session_state.copy_history) / len(st.session_state.copy_history)
-        st.metric("Avg. Brand Compliance", f"{avg_compliance:.1%}")
+        st.metric("Avg. Brand Compliance", f"{stats['total_compliance'] / stats['n']:.1%}")
     with col3:
-        avg_words = sum(copy.word_count for copy in st.session_state.copy_history) / len(st.session_state.copy_history)
-        st.metric("Avg. Word Count", f"{avg_words:.0f}")
+        st.metric("Avg. Word Count", f"{stats['total_words'] / stats['n']:.0f}")
     
     # Copy list
     st.subheader("📋 Recent Copies")
     
-    for i, copy in enumerate(reversed(st.session_state.copy_history[-10:])):  # Show last 10
-        with st.expander(f"Copy #{len(st.session_state.copy_history)-i} - {copy.timestamp.strftime('%Y-%m-%d %H:%M')}"):
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                if isinstance(copy.content, pd.DataFrame):
-                    st.dataframe(copy.content)
-                else:
-                    st.text_area("Content", value=str(copy.content), height=100, key=f"history_{i}")
-            
-            with col2:
-                st.metric("Words", copy.word_count)
-                st.metric("Compliance", f"{copy.compliance_score:.1%}")
-                st.json(copy.metadata)
+    summary = history_frame()
+    total_pages = -(-len(summary) // _HISTORY_PAGE_SIZE)
+    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+    
+    # Newest copies first
+    end = len(summary) - (page - 1) * _HISTORY_PAGE_SIZE
+    page_df = summary.iloc[max(end - _HISTORY_PAGE_SIZE, 0):end].iloc[::-1]
+    event = st.dataframe(
+        page_df,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"history_table_{page}"
+    )
+    
+    # Only the selected copy gets its full detail view
+    if event.selection.rows:
+        number = int(page_df.iloc[event.selection.rows[0]]["Copy #"])
+        history = st.session_state.copy_history
+        archived = st.session_state.stats["n"] - len(history)
+        if number > archived:
+            history_entry(number, history[number - 1 - archived])
+        elif pa is not None:
+            st.info(f"Copy #{number} has been archived to disk and is included in the history export.")
+        else:
+            st.info(f"Copy #{number} is no longer kept in memory.")
+    else:
+        st.caption("Select a row to see the full copy.")
+
+def history_entry(number: int, copy: GeneratedCopy):
+    """Render the detail view of a single history entry"""
+    st.markdown(f"**Copy #{number}** - {copy.timestamp.strftime('%Y-%m-%d %H:%M')}")
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        if isinstance(copy.content, pd.DataFrame):
+            st.dataframe(copy.content)
+        else:
+            content = str(copy.content)
+            if len(content) > _HISTORY_PREVIEW_CHARS and not st.toggle("Show full", key=f"history_full_{number}"):
+                content = content[:_HISTORY_PREVIEW_CHARS] + "…"
+            st.code(content, language=None, wrap_lines=True)
+    
+    with col2:
+        st.metric("Words", copy.word_count)
+        st.metric("Compliance", f"{copy.compliance_score:.1%}")
+        st.json(copy.metadata)
 
+@st.fragment
 def analytics_interface():
     """Interface for analytics and insights"""
     st.markdown('<h2 class="section-header">Analytics & Insights</h2>', unsafe_allow_html=True)
@@ -371,32 +704,35 @@ def analytics_interface():
         st.subheader("📈 Trends Over Time")
         
         # Create dataframe for plotting
-        history_data = []
-        for i, copy in enumerate(st.session_state.copy_history):
-            history_data.append({
-                "Copy #": i + 1,
-                "Brand Compliance": copy.compliance_score,
-                "Word Count": copy.word_count,
-                "Timestamp": copy.timestamp
-            })
-        
-        df = pd.DataFrame(history_data)
+        df = trend_frame()
         
         col1, col2 = st.columns(2)
         with col1:
-            st.line_chart(df.set_index("Copy #")["Brand Compliance"])
+            st.line_chart(df["Brand Compliance"])
             st.caption("Brand Compliance Over Time")
         
         with col2:
-            st.line_chart(df.set_index("Copy #")["Word Count"])
+            st.line_chart(df["Word Count"])
             st.caption("Word Count Over Time")
     
     # Content type analysis
     st.subheader("📊 Content Type Distribution")
-    content_types = [copy.metadata.get("request_type", "Unknown") for copy in st.session_state.copy_history]
-    content_type_counts = pd.Series(content_types).value_counts()
-    st.bar_chart(content_type_counts)
+    st.bar_chart(pd.Series(st.session_state.content_type_counts))
+
+@st.dialog("⚠️ Confirm Clear History")
+def confirm_clear_history():
+    """Modal confirmation before the copy history is cleared"""
+    st.write("This permanently removes all generated copies from this session.")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Clear History", type="primary", use_container_width=True):
+            clear_history()
+            st.rerun()
+    with col2:
+        if st.button("Cancel", use_container_width=True):
+            st.rerun()
 
+@st.fragment
 def settings_interface():
     """Interface for app settings and configurations"""
     st.markdown('<h2 class="section-header">Settings & Configuration</h2>', unsafe_allow_html=True)
@@ -409,17 +745,17 @@ def settings_interface():
     with col1:
         if st.button("📥 Export Copy History"):
             if st.session_state.copy_history:
-                export_data = []
+                export_data = load_archived_copies()
                 for copy in st.session_state.copy_history:
                     export_data.append({
-                        "timestamp": copy.timestamp.isoformat(),
-                        "content": str(copy.content),
+                        "timestamp": copy.timestamp,
+                        "content": content_as_text(copy.content),
                         "word_count": copy.word_count,
                         "compliance_score": copy.compliance_score,
                         "metadata": copy.metadata
                     })
                 
-                json_data = json.dumps(export_data, indent=2)
+                json_data = orjson.dumps(export_data, option=orjson.OPT_INDENT_2)
                 st.download_button(
                     "📥 Download History JSON",
                     json_data,
@@ -431,37 +767,21 @@ def settings_interface():
     
     with col2:
         if st.button("🗑️ Clear History"):
-            if st.button("⚠️ Confirm Clear History", type="secondary"):
-                st.session_state.copy_history = []
-                st.success("History cleared!")
-                st.rerun()
+            confirm_clear_history()
     
     # Brand guidelines export
     st.subheader("📋 Brand Guidelines")
     if st.session_state.brand_guidelines:
-        guidelines_json = json.dumps(asdict(st.session_state.brand_guidelines), indent=2)
         st.download_button(
             "📥 Export Brand Guidelines",
-            guidelines_json,
+            st.session_state.brand_guidelines_json,
             "brand_guidelines.json",
             "application/json"
         )
     
     # App information
     st.subheader("ℹ️ About")
-    st.info("""
-    **AI Copywriting Agent v1.0**
-    
-    This application helps you generate brand-compliant copy using AI while maintaining consistency 
-    with your brand guidelines and learning from your previous successful copies.
-    
-    **Features:**
-    - Multi-modal input processing
-    - Brand compliance scoring
-    - Multiple output formats
-    - Copy history and analytics
-    - Export/import capabilities
-    """)
+    st.info(_ABOUT)
 
 if __name__ == "__main__":
     main()